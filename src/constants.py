@@ -18,6 +18,18 @@ VOLUME_COL = "volume"
 DEFAULT_PERIOD = "5y"
 DEFAULT_INTERVAL = "1d"
 
+# Paramètres de récupération des données
+YF_MAX_TICKERS_PER_REQUEST = 20
+METADATA_CHUNK_SIZE = 1024
+PARQUET_BATCH_SIZE = 65536
+
+# Paramètres de la base de données
+READ_POOL_SIZE = 5
+PRICE_CACHE_MAXSIZE = 256
+
+# Paramètres de sérialisation
+ISO_BATCH_PARSE_MIN_SIZE = 32
+
 # Messages d'erreur
 ERR_DATA_NOT_FOUND = "Données non trouvées pour le ticker {}"
 ERR_INVALID_DATE = "Format de date invalide : {}"
@@ -7,16 +7,112 @@ Module pour l'Extraction, la Transformation et le Chargement (ETL) des données.
 """
 
 from datetime import datetime
-from typing import Dict, List, Optional, Union
+from itertools import chain, repeat
+from typing import Dict, Iterator, List, Optional, Tuple, Union
 
 import numpy as np
 import pandas as pd
+import streamlit as st
 import yfinance as yf
 
 from src.constants import *
-from src.model import ETF, ETFPriceData
+from src.model import PRICE_DTYPE, ETF, ETFPriceData, ETFPriceSeries
 from src.repository import ETFRepository
 
+METADATA_DTYPES = {
+    TICKER_COL: "string",
+    NAME_COL: "string",
+    ISSUER_COL: "string",
+    TER_COL: "float64",
+}
+
+
+def _naive_utc(index: pd.DatetimeIndex) -> pd.DatetimeIndex:
+    """Dates en UTC sans fuseau, comme celles relues depuis la base."""
+    if index.tz is None:
+        return index
+    return index.tz_convert("UTC").tz_localize(None)
+
+
+def _frame_to_price_series(ticker: str, frame: pd.DataFrame) -> ETFPriceSeries:
+    """Convertit un DataFrame yfinance en ETFPriceSeries sans itérer les lignes."""
+    closes = frame["Close"].to_numpy(dtype=PRICE_DTYPE)
+    mask = ~np.isnan(closes)
+    return ETFPriceSeries(
+        ticker=ticker,
+        dates=_naive_utc(frame.index).to_pydatetime()[mask],
+        adj_close=closes[mask],
+        volume=frame["Volume"].to_numpy(dtype=np.float64)[mask],
+    )
+
+
+def _frame_to_price_rows(
+    ticker: str, frame: pd.DataFrame
+) -> Iterator[Tuple[str, int, float, float]]:
+    """Convertit un DataFrame yfinance en lignes prêtes pour save_price_data_raw."""
+    closes = frame["Close"].to_numpy(dtype=PRICE_DTYPE)
+    mask = ~np.isnan(closes)
+    # Secondes Unix (UTC) lues directement dans l'index, quelle que soit sa résolution
+    epochs = frame.index.as_unit("s").asi8[mask]
+    return zip(
+        repeat(ticker),
+        epochs.tolist(),
+        closes[mask].tolist(),
+        frame["Volume"].to_numpy(dtype=np.float64)[mask].tolist(),
+    )
+
+
+class _EmptyHistoryError(Exception):
+    """Historique vide (échec ou limitation yfinance) : à ne pas mémoriser."""
+
+
+def _download_history(
+    ticker: str,
+    period: str,
+    start_date: Optional[datetime],
+    end_date: Optional[datetime],
+) -> pd.DataFrame:
+    """Télécharge l'historique yfinance d'un ticker."""
+    return yf.Ticker(ticker).history(period=period, start=start_date, end=end_date)
+
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _fetch_history(
+    ticker: str,
+    period: str,
+    start_date: Optional[datetime],
+    end_date: Optional[datetime],
+) -> pd.DataFrame:
+    """Historique yfinance d'un ticker, mémorisé entre les réexécutions Streamlit."""
+    hist = _download_history(ticker, period, start_date, end_date)
+    # yfinance renvoie un DataFrame vide en cas d'échec au lieu de lever une
+    # exception ; st.cache_data ne mémorise pas les exceptions
+    if hist.empty:
+        raise _EmptyHistoryError(ticker)
+    return hist
+
+
+def _download_chunk(
+    tickers: List[str],
+    start_date: Optional[datetime],
+    end_date: Optional[datetime],
+    period: str,
+) -> pd.DataFrame:
+    """Télécharge un lot de tickers et renvoie toujours un DataFrame multi-index."""
+    data = yf.download(
+        tickers=" ".join(tickers),
+        start=start_date,
+        end=end_date,
+        period=period,
+        group_by="ticker",
+        auto_adjust=True,
+        threads=True,
+    )
+    # Pour un seul ticker, yf.download peut retourner un DataFrame simple
+    if not isinstance(data.columns, pd.MultiIndex):
+        data = pd.concat({tickers[0]: data}, axis=1)
+    return data
+
 
 class ETFDataLoader:
     def __init__(self, repository: ETFRepository):
@@ -24,17 +120,44 @@ class ETFDataLoader:
 
     def load_etf_metadata(self, csv_path: str) -> List[ETF]:
         """Charge les métadonnées des ETFs depuis un fichier CSV."""
-        df = pd.read_csv(csv_path)
-        return [
-            ETF(
-                ticker=row[TICKER_COL],
-                name=row[NAME_COL],
-                issuer=row.get(ISSUER_COL),
-                ter=row.get(TER_COL),
-                inception_date=pd.to_datetime(row.get(INCEPTION_DATE_COL)),
-            )
-            for _, row in df.iterrows()
-        ]
+        # Seules les colonnes utiles sont lues, avec des types explicites
+        header = pd.read_csv(csv_path, nrows=0).columns
+        usecols = [col for col in METADATA_DTYPES if col in header]
+        parse_dates = [INCEPTION_DATE_COL] if INCEPTION_DATE_COL in header else []
+        reader = pd.read_csv(
+            csv_path,
+            usecols=usecols + parse_dates,
+            dtype={col: METADATA_DTYPES[col] for col in usecols},
+            parse_dates=parse_dates,
+            chunksize=METADATA_CHUNK_SIZE,
+        )
+
+        # Présence des colonnes optionnelles déterminée une fois pour toutes
+        has_issuer = ISSUER_COL in usecols
+        has_ter = TER_COL in usecols
+        has_inception_date = bool(parse_dates)
+
+        # Lecture par blocs : la mémoire reste bornée quelle que soit la taille du CSV
+        etfs = []
+        for chunk in reader:
+            for row in chunk.itertuples(index=False):
+                issuer = getattr(row, ISSUER_COL) if has_issuer else None
+                ter = getattr(row, TER_COL) if has_ter else None
+                inception_date = (
+                    getattr(row, INCEPTION_DATE_COL) if has_inception_date else None
+                )
+                etfs.append(
+                    ETF(
+                        ticker=getattr(row, TICKER_COL),
+                        name=getattr(row, NAME_COL),
+                        issuer=issuer if pd.notna(issuer) else None,
+                        ter=ter if pd.notna(ter) else None,
+                        inception_date=(
+                            inception_date if pd.notna(inception_date) else None
+                        ),
+                    )
+                )
+        return etfs
 
     def fetch_price_data(
         self,
@@ -45,33 +168,47 @@ class ETFDataLoader:
         use_cache: bool = True,
     ) -> List[ETFPriceData]:
         """Récupère les données de prix depuis yfinance ou le cache."""
+        return self.fetch_price_series(
+            ticker, start_date, end_date, period, use_cache
+        ).to_price_data()
+
+    def fetch_price_series(
+        self,
+        ticker: str,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        period: str = DEFAULT_PERIOD,
+        use_cache: bool = True,
+    ) -> ETFPriceSeries:
+        """Récupère les données de prix sous forme de série par colonnes."""
         # Vérifie d'abord dans la base de données si on utilise le cache
         if use_cache:
-            cached_data = self.repository.get_price_data(ticker, start_date, end_date)
-            if cached_data:
-                return cached_data
+            cached_series = self.repository.get_price_series(
+                ticker, start_date, end_date
+            )
+            if len(cached_series):
+                return cached_series
 
         # Si pas dans le cache ou cache désactivé, récupère depuis yfinance
         try:
-            etf = yf.Ticker(ticker)
-            hist = etf.history(period=period, start=start_date, end=end_date)
-
-            # Conversion en liste d'ETFPriceData
-            price_data = [
-                ETFPriceData(
-                    ticker=ticker,
-                    date=index,
-                    adj_close=row["Close"],
-                    volume=row["Volume"],
-                )
-                for index, row in hist.iterrows()
-            ]
+            # Sans cache, on force un nouveau téléchargement (pas de mémoïsation)
+            fetch_history = _fetch_history if use_cache else _download_history
+            try:
+                hist = fetch_history(ticker, period, start_date, end_date)
+            except _EmptyHistoryError:
+                hist = None
+            if hist is None or hist.empty:
+                # Aucune donnée : série vide, retentée au prochain appel
+                return ETFPriceSeries.from_price_data(ticker, [])
+
+            # Conversion directe des colonnes en tableaux numpy
+            price_series = _frame_to_price_series(ticker, hist)
 
             # Sauvegarde dans le cache si activé
-            if use_cache and price_data:
-                self.repository.save_price_data(price_data)
+            if use_cache and len(price_series):
+                self.repository.save_price_data_raw(_frame_to_price_rows(ticker, hist))
 
-            return price_data
+            return price_series
 
         except Exception as e:
             raise ValueError(
@@ -105,84 +242,135 @@ class ETFDataLoader:
         Returns:
             Dictionnaire avec les tickers comme clés et les listes de prix comme valeurs
         """
+        return {
+            ticker: price_series.to_price_data()
+            for ticker, price_series in self.fetch_multiple_etfs_series(
+                tickers, start_date, end_date, period, use_cache
+            ).items()
+        }
+
+    def fetch_multiple_etfs_series(
+        self,
+        tickers: List[str],
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        period: str = DEFAULT_PERIOD,
+        use_cache: bool = True,
+    ) -> Dict[str, ETFPriceSeries]:
+        """Récupère les prix de plusieurs ETFs sous forme de séries par colonnes."""
+        requested = list(dict.fromkeys(tickers))
+        cached_series = {}
+
         # Vérifier d'abord le cache
         if use_cache:
-            cached_data = {}
-            missing_tickers = []
-            for ticker in tickers:
-                data = self.repository.get_price_data(ticker, start_date, end_date)
-                if data:
-                    cached_data[ticker] = data
-                else:
-                    missing_tickers.append(ticker)
+            # Une seule requête SQLite pour l'ensemble des tickers
+            cached_series = {
+                ticker: price_series
+                for ticker, price_series in self.repository.get_price_series_multi(
+                    requested, start_date, end_date
+                ).items()
+                if len(price_series)
+            }
+            tickers = [t for t in requested if t not in cached_series]
 
-            if not missing_tickers:
-                return cached_data
-
-            # Ne récupérer que les tickers manquants
-            tickers = missing_tickers
+            if not tickers:
+                return cached_series
+        else:
+            tickers = requested
 
         try:
-            # Télécharger les données en une seule requête
-            data = yf.download(
-                tickers=" ".join(tickers),
-                start=start_date,
-                end=end_date,
-                period=period,
-                group_by="ticker",
-                auto_adjust=True,
+            # Yahoo limite le nombre de symboles par requête : on découpe en lots.
+            # Les lots sont téléchargés l'un après l'autre (threads=True parallélise
+            # déjà l'intérieur d'un lot) : les anciennes versions 0.2.x de yfinance
+            # partagent un état global entre appels à download
+            data = pd.concat(
+                [
+                    _download_chunk(
+                        tickers[i : i + YF_MAX_TICKERS_PER_REQUEST],
+                        start_date,
+                        end_date,
+                        period,
+                    )
+                    for i in range(0, len(tickers), YF_MAX_TICKERS_PER_REQUEST)
+                ],
+                axis=1,
             )
 
-            result = {}
-
-            # Si un seul ticker, yf.download retourne un DataFrame simple
-            if len(tickers) == 1:
-                ticker = tickers[0]
-                price_data = [
-                    ETFPriceData(
-                        ticker=ticker,
-                        date=index,
-                        adj_close=row["Close"],
-                        volume=row["Volume"],
+            downloaded = {}
+            frames = {}
+            for ticker in tickers:
+                try:
+                    frames[ticker] = data[ticker]
+                    downloaded[ticker] = _frame_to_price_series(ticker, frames[ticker])
+                except KeyError:
+                    print(f"Avertissement: Données non trouvées pour {ticker}")
+                    downloaded[ticker] = ETFPriceSeries.from_price_data(ticker, [])
+
+            # Sauvegarde de toutes les nouvelles données en une seule transaction
+            if use_cache and frames:
+                self.repository.save_price_data_raw(
+                    chain.from_iterable(
+                        _frame_to_price_rows(ticker, frame)
+                        for ticker, frame in frames.items()
                     )
-                    for index, row in data.iterrows()
-                    if not pd.isna(row["Close"])
-                ]
-                if use_cache:
-                    self.repository.save_price_data(price_data)
-                result[ticker] = price_data
-
-            # Sinon, c'est un DataFrame multi-index
-            else:
-                for ticker in tickers:
-                    try:
-                        ticker_data = data[ticker]
-                        price_data = [
-                            ETFPriceData(
-                                ticker=ticker,
-                                date=index,
-                                adj_close=row["Close"],
-                                volume=row["Volume"],
-                            )
-                            for index, row in ticker_data.iterrows()
-                            if not pd.isna(row["Close"])
-                        ]
-                        if use_cache and price_data:
-                            self.repository.save_price_data(price_data)
-                        result[ticker] = price_data
-                    except KeyError:
-                        print(f"Avertissement: Données non trouvées pour {ticker}")
-                        result[ticker] = []
-
-            # Fusionner avec les données en cache si nécessaire
-            if use_cache and cached_data:
-                result.update(cached_data)
-
-            return result
+                )
+
+            # Fusion avec les séries en cache, dans l'ordre demandé
+            return {
+                ticker: cached_series.get(ticker, downloaded.get(ticker))
+                for ticker in requested
+            }
 
         except Exception as e:
             raise ValueError(f"Erreur lors de la récupération des données: {str(e)}")
 
+    def bulk_import_prices(
+        self, parquet_path: str, batch_size: int = PARQUET_BATCH_SIZE
+    ) -> int:
+        """
+        Importe un historique de prix volumineux depuis un fichier Parquet.
+
+        Le fichier doit contenir les colonnes ticker, date, adj_close et volume.
+        Il est lu par lots Arrow, convertis colonne par colonne, et l'ensemble
+        est écrit en une seule transaction.
+
+        Returns:
+            Nombre de lignes importées
+        """
+        # Import local : pyarrow n'est nécessaire que pour les imports massifs
+        import pyarrow as pa
+        import pyarrow.compute as pc
+        import pyarrow.parquet as pq
+
+        parquet_file = pq.ParquetFile(parquet_path)
+        imported = 0
+
+        def rows():
+            nonlocal imported
+            for batch in parquet_file.iter_batches(
+                batch_size=batch_size,
+                columns=[TICKER_COL, DATE_COL, ADJ_CLOSE_COL, VOLUME_COL],
+            ):
+                dates = batch.column(DATE_COL)
+                if pa.types.is_timestamp(dates.type):
+                    seconds = pa.timestamp("s", tz=dates.type.tz)
+                else:
+                    seconds = pa.timestamp("s")
+                # Secondes Unix calculées par Arrow, sans objet datetime Python
+                epochs = pc.cast(
+                    pc.cast(dates, seconds, safe=False), pa.int64()
+                ).to_pylist()
+                imported += len(epochs)
+                yield from zip(
+                    batch.column(TICKER_COL).to_pylist(),
+                    epochs,
+                    batch.column(ADJ_CLOSE_COL).to_pylist(),
+                    batch.column(VOLUME_COL).to_pylist(),
+                )
+
+        self.repository.save_price_data_raw(rows())
+        return imported
+
 
 def run_etl_pipeline():
     """Exécute le pipeline ETL complet."""
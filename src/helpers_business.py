@@ -4,86 +4,192 @@ Calcul des indicateurs de performance, des ratios et des statistiques.
 """
 
 from datetime import datetime
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple, Union
 
 import numpy as np
 
-from src.model import ETFPriceData, PerformanceMetrics
+from src.model import PRICE_DTYPE, ETFPriceData, ETFPriceSeries, PerformanceMetrics
 
 
 def calculate_returns(prices: List[float]) -> List[float]:
     """Calcule les rendements journaliers."""
-    prices_array = np.array(prices)
+    prices_array = np.asarray(prices)
     return (prices_array[1:] / prices_array[:-1]) - 1
 
 
-def calculate_sortino_ratio(returns: np.ndarray, risk_free_rate: float) -> float:
+def calculate_sortino_ratio(
+    returns: np.ndarray,
+    risk_free_rate: float,
+    mean_excess_return: Optional[float] = None,
+) -> float:
     """Calcule le ratio de Sortino."""
-    excess_returns = returns - risk_free_rate / 252  # daily risk-free rate
-    downside_returns = np.where(returns < 0, returns, 0)
-    downside_volatility = np.std(downside_returns) * np.sqrt(252)
+    if mean_excess_return is None:
+        mean_excess_return = np.mean(returns) - risk_free_rate / 252
+    downside_returns = returns[returns < 0]
+    downside_volatility = (
+        np.sqrt(np.mean(downside_returns**2) * 252) if downside_returns.size else 0.0
+    )
     return (
-        np.mean(excess_returns) * 252 / downside_volatility
+        mean_excess_return * 252 / downside_volatility
         if downside_volatility != 0
         else 0
     )
 
 
-def calculate_performance_metrics(
-    price_data: List[ETFPriceData],
-    risk_free_rate: float = 0.01,
-    benchmark_returns: np.ndarray = None,
-) -> PerformanceMetrics:
-    """Calcule les métriques de performance pour un ETF."""
-    prices = np.array([data.adj_close for data in price_data])
-    returns = calculate_returns(prices)
+class MetricsScratch:
+    """Tampons de travail réutilisés d'un ETF à l'autre par le calcul des métriques."""
+
+    def __init__(self, capacity: int = 0, dtype=PRICE_DTYPE):
+        self.dtype = dtype
+        self.capacity = 0
+        self.reserve(capacity)
+
+    def reserve(self, capacity: int) -> None:
+        """Agrandit les tampons si nécessaire pour contenir `capacity` prix."""
+        if capacity <= self.capacity:
+            return
+        self.capacity = capacity
+        self.returns_buf = np.empty(capacity, dtype=self.dtype)
+        self.centered_buf = np.empty(capacity, dtype=self.dtype)
+        self.rmax_buf = np.empty(capacity, dtype=self.dtype)
+        self.benchmark_buf = np.empty(capacity, dtype=self.dtype)
+
+
+def _metrics_kernel(
+    prices: np.ndarray,
+    benchmark_returns: Optional[np.ndarray],
+    risk_free_rate: float,
+    scratch: MetricsScratch,
+) -> Tuple[Optional[float], ...]:
+    """
+    Calcule toutes les métriques numériques à partir d'un tableau de prix contigu.
+
+    Les tableaux intermédiaires sont écrits dans les tampons de `scratch`.
+    Retourne le tuple (holding_period, total_return, annualized_return, volatility,
+    sharpe_ratio, sortino_ratio, max_drawdown, beta, alpha, r_squared,
+    tracking_error, information_ratio). Les métriques relatives au benchmark
+    valent None si aucun benchmark compatible n'est fourni.
+    """
+    n = len(prices)
+    scratch.reserve(n)
+    returns = scratch.returns_buf[: n - 1]
+    np.divide(prices[1:], prices[:-1], out=returns)
+    np.subtract(returns, 1, out=returns)
 
     # Rendements
     total_return = (prices[-1] / prices[0]) - 1
     holding_period = len(returns)
     annualized_return = (1 + total_return) ** (252 / holding_period) - 1
 
+    # Moments centrés calculés une seule fois et réutilisés par toutes les métriques
+    mean_return = np.mean(returns)
+    centered_returns = np.subtract(
+        returns, mean_return, out=scratch.centered_buf[: n - 1]
+    )
+    variance = np.dot(centered_returns, centered_returns) / holding_period
+
     # Risque
-    volatility = np.std(returns) * np.sqrt(252)
+    volatility = np.sqrt(variance * 252)
 
     # Ratios de performance ajustés au risque
-    excess_returns = returns - risk_free_rate / 252  # daily risk-free rate
-    sharpe_ratio = np.mean(excess_returns) * 252 / volatility if volatility != 0 else 0
-    sortino_ratio = calculate_sortino_ratio(returns, risk_free_rate)
+    mean_excess_return = mean_return - risk_free_rate / 252  # daily risk-free rate
+    sharpe_ratio = mean_excess_return * 252 / volatility if volatility != 0 else 0
+    sortino_ratio = calculate_sortino_ratio(returns, risk_free_rate, mean_excess_return)
 
-    # Maximum Drawdown
-    cumulative_returns = np.cumprod(1 + returns)
-    running_max = np.maximum.accumulate(cumulative_returns)
-    drawdowns = (running_max - cumulative_returns) / running_max
-    max_drawdown = np.max(drawdowns)
+    # Maximum Drawdown (la performance cumulée est proportionnelle aux prix)
+    running_max = np.maximum.accumulate(prices, out=scratch.rmax_buf[:n])
+    max_drawdown = 1 - np.min(np.divide(prices, running_max, out=running_max))
 
     # Métriques relatives au benchmark si disponible
     if benchmark_returns is not None and len(benchmark_returns) == len(returns):
+        mean_benchmark = np.mean(benchmark_returns)
+        centered_benchmark = np.subtract(
+            benchmark_returns, mean_benchmark, out=scratch.benchmark_buf[: n - 1]
+        )
+        benchmark_variance = (
+            np.dot(centered_benchmark, centered_benchmark) / holding_period
+        )
+        covariance = np.dot(centered_returns, centered_benchmark) / holding_period
+
         # Beta et Alpha
-        covariance = np.cov(returns, benchmark_returns)[0, 1]
-        benchmark_variance = np.var(benchmark_returns)
         beta = covariance / benchmark_variance if benchmark_variance != 0 else 1
 
         expected_return = risk_free_rate + beta * (
-            np.mean(benchmark_returns) * 252 - risk_free_rate
+            mean_benchmark * 252 - risk_free_rate
         )
         alpha = annualized_return - expected_return
 
         # R-squared
-        correlation = np.corrcoef(returns, benchmark_returns)[0, 1]
+        correlation = (
+            covariance / np.sqrt(variance * benchmark_variance)
+            if variance != 0 and benchmark_variance != 0
+            else 0
+        )
         r_squared = correlation**2
 
-        # Tracking Error
-        tracking_error = np.std(returns - benchmark_returns) * np.sqrt(252)
+        # Tracking Error : Var(r - b) = Var(r) + Var(b) - 2 Cov(r, b)
+        active_variance = max(variance + benchmark_variance - 2 * covariance, 0)
+        tracking_error = np.sqrt(active_variance * 252)
 
         # Information Ratio
-        active_return = annualized_return - np.mean(benchmark_returns) * 252
+        active_return = annualized_return - mean_benchmark * 252
         information_ratio = active_return / tracking_error if tracking_error != 0 else 0
     else:
         beta = alpha = r_squared = tracking_error = information_ratio = None
 
+    return (
+        holding_period,
+        total_return,
+        annualized_return,
+        volatility,
+        sharpe_ratio,
+        sortino_ratio,
+        max_drawdown,
+        beta,
+        alpha,
+        r_squared,
+        tracking_error,
+        information_ratio,
+    )
+
+
+def calculate_performance_metrics(
+    price_data: Union[ETFPriceSeries, List[ETFPriceData]],
+    risk_free_rate: float = 0.01,
+    benchmark_returns: np.ndarray = None,
+    scratch: Optional[MetricsScratch] = None,
+) -> PerformanceMetrics:
+    """Calcule les métriques de performance pour un ETF."""
+    # Compatibilité avec les appelants qui passent encore une liste d'ETFPriceData
+    if not isinstance(price_data, ETFPriceSeries):
+        price_data = ETFPriceSeries.from_price_data(price_data[0].ticker, price_data)
+    # Les calculs restent dans la précision de stockage des prix (float32)
+    prices = np.ascontiguousarray(price_data.adj_close, dtype=PRICE_DTYPE)
+    if benchmark_returns is not None:
+        benchmark_returns = np.ascontiguousarray(benchmark_returns, dtype=PRICE_DTYPE)
+
+    if scratch is None:
+        scratch = MetricsScratch(len(prices))
+
+    holding_period, *values = _metrics_kernel(
+        prices, benchmark_returns, risk_free_rate, scratch
+    )
+    (
+        total_return,
+        annualized_return,
+        volatility,
+        sharpe_ratio,
+        sortino_ratio,
+        max_drawdown,
+        beta,
+        alpha,
+        r_squared,
+        tracking_error,
+        information_ratio,
+    ) = (None if value is None else float(value) for value in values)
+
     return PerformanceMetrics(
-        ticker=price_data[0].ticker,
+        ticker=price_data.ticker,
         period=f"{holding_period}d",
         total_return=total_return,
         annualized_return=annualized_return,
@@ -97,3 +203,24 @@ def calculate_performance_metrics(
         tracking_error=tracking_error,
         information_ratio=information_ratio,
     )
+
+
+def compute_all_metrics(
+    price_data_by_ticker: Dict[str, Union[ETFPriceSeries, List[ETFPriceData]]],
+    risk_free_rate: float = 0.01,
+    benchmark_returns: np.ndarray = None,
+) -> Dict[str, PerformanceMetrics]:
+    """Calcule les métriques de performance de plusieurs ETFs."""
+    # Un seul jeu de tampons, dimensionné pour la plus longue série
+    scratch = MetricsScratch(
+        max((len(prices) for prices in price_data_by_ticker.values()), default=0)
+    )
+    return {
+        ticker: calculate_performance_metrics(
+            prices,
+            risk_free_rate=risk_free_rate,
+            benchmark_returns=benchmark_returns,
+            scratch=scratch,
+        )
+        for ticker, prices in price_data_by_ticker.items()
+    }
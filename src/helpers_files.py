@@ -2,17 +2,33 @@
 Module pour la gestion des fichiers et des chemins.
 """
 
+import copy
 import os
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Dict
 
 import yaml
 
+# Chargeur libyaml (C) si disponible, sinon chargeur pur Python
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
+
+@lru_cache(maxsize=4)
+def _load_yaml_config_cached(config_path: str, mtime: float) -> Dict[str, Any]:
+    """Parse un fichier YAML ; le cache est invalidé quand `mtime` change."""
+    with open(config_path, "r") as f:
+        return yaml.load(f, Loader=_YamlLoader)
+
 
 def load_yaml_config(config_path: str) -> Dict[str, Any]:
     """Charge un fichier de configuration YAML."""
-    with open(config_path, "r") as f:
-        return yaml.safe_load(f)
+    config = _load_yaml_config_cached(config_path, os.path.getmtime(config_path))
+    # Copie pour que l'appelant ne modifie pas la version en cache
+    return copy.deepcopy(config)
 
 
 def ensure_directory_exists(directory_path: str) -> None:
@@ -3,9 +3,15 @@ Module pour la sérialisation et la désérialisation des objets du modèle.
 """
 
 import json
+import warnings
+from dataclasses import asdict
 from datetime import datetime
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Union
 
+import orjson
+import pandas as pd
+
+from src.constants import *
 from src.model import ETF, ComparisonResult, ETFPriceData, PerformanceMetrics
 
 
@@ -20,9 +26,17 @@ class ETFEncoder(json.JSONEncoder):
         return super().default(obj)
 
 
+def _isoformat_dates(data: Dict[str, Any], *keys: str) -> Dict[str, Any]:
+    """Convertit en chaînes ISO les dates présentes aux clés indiquées."""
+    for key in keys:
+        if data.get(key):
+            data[key] = data[key].isoformat()
+    return data
+
+
 def serialize_etf(etf: ETF) -> Dict[str, Any]:
     """Sérialise un objet ETF en dictionnaire."""
-    return json.loads(json.dumps(etf, cls=ETFEncoder))
+    return _isoformat_dates(asdict(etf), "inception_date")
 
 
 def deserialize_etf(data: Dict[str, Any]) -> ETF:
@@ -34,7 +48,30 @@ def deserialize_etf(data: Dict[str, Any]) -> ETF:
 
 def serialize_comparison_result(result: ComparisonResult) -> Dict[str, Any]:
     """Sérialise un objet ComparisonResult en dictionnaire."""
-    return json.loads(json.dumps(result, cls=ETFEncoder))
+    data = _isoformat_dates(
+        asdict(result), "start_date", "end_date", "analysis_timestamp"
+    )
+    _isoformat_dates(data["base_etf"], "inception_date")
+    for etf in data["comparison_etfs"]:
+        _isoformat_dates(etf, "inception_date")
+    return data
+
+
+def _parse_iso_dates(values: List[Optional[str]]) -> List[Optional[datetime]]:
+    """Parse des dates ISO, en un seul appel vectorisé pandas au-delà d'un seuil."""
+    if len(values) > ISO_BATCH_PARSE_MIN_SIZE:
+        try:
+            with warnings.catch_warnings():
+                # pandas 2 avertit du changement de comportement sur les fuseaux mixtes
+                warnings.simplefilter("ignore", FutureWarning)
+                parsed = pd.to_datetime(values, format="ISO8601")
+        except ValueError:
+            parsed = None
+        # Fuseaux horaires hétérogènes : pandas 3 lève une erreur, pandas 2 renvoie
+        # un Index d'objets ; dans les deux cas, parsing élément par élément
+        if isinstance(parsed, pd.DatetimeIndex):
+            return [None if pd.isna(date) else date for date in parsed.to_pydatetime()]
+    return [datetime.fromisoformat(value) if value else None for value in values]
 
 
 def deserialize_comparison_result(data: Dict[str, Any]) -> ComparisonResult:
@@ -46,7 +83,14 @@ def deserialize_comparison_result(data: Dict[str, Any]) -> ComparisonResult:
 
     # Conversion des ETFs
     data["base_etf"] = deserialize_etf(data["base_etf"])
-    data["comparison_etfs"] = [deserialize_etf(etf) for etf in data["comparison_etfs"]]
+    comparison_etfs = data["comparison_etfs"]
+    inception_dates = _parse_iso_dates(
+        [etf.get("inception_date") for etf in comparison_etfs]
+    )
+    data["comparison_etfs"] = [
+        ETF(**{**etf, "inception_date": inception_date})
+        for etf, inception_date in zip(comparison_etfs, inception_dates)
+    ]
 
     # Conversion des métriques
     data["metrics"] = {
@@ -55,3 +99,29 @@ def deserialize_comparison_result(data: Dict[str, Any]) -> ComparisonResult:
     }
 
     return ComparisonResult(**data)
+
+
+def _orjson_default(obj):
+    """Gère les types résiduels non pris en charge nativement par orjson."""
+    if hasattr(obj, "isoformat"):  # pandas.Timestamp, NaT
+        return obj.isoformat()
+    raise TypeError
+
+
+def dump_comparison_result(result: ComparisonResult) -> bytes:
+    """Sérialise un objet ComparisonResult en JSON (bytes) avec orjson."""
+    return orjson.dumps(
+        result,
+        default=_orjson_default,
+        option=orjson.OPT_SERIALIZE_DATACLASS | orjson.OPT_SERIALIZE_NUMPY,
+    )
+
+
+def load_comparison_result(raw: Union[bytes, str]) -> ComparisonResult:
+    """Désérialise un objet ComparisonResult depuis du JSON produit par orjson."""
+    return deserialize_comparison_result(orjson.loads(raw))
+
+
+def comparison_result_to_json(result: ComparisonResult) -> str:
+    """Sérialise un objet ComparisonResult en chaîne JSON."""
+    return dump_comparison_result(result).decode("utf-8")
@@ -14,6 +14,13 @@ from src.repository import ETFRepository
 from src.view import ETFDashboard
 
 
+@st.cache_resource
+def get_repository(db_path: str) -> ETFRepository:
+    """Repository unique par base : connexion et caches survivent aux réexécutions."""
+    os.makedirs(os.path.dirname(db_path), exist_ok=True)
+    return ETFRepository(db_path)
+
+
 def main():
     # Initialisation de Streamlit
     st.set_page_config(
@@ -23,10 +30,8 @@ def main():
     # Chargement de la configuration
     config = load_yaml_config("src/config.yaml")
 
-    # Initialisation du repository
-    db_path = config["database"]["path"]
-    os.makedirs(os.path.dirname(db_path), exist_ok=True)
-    repository = ETFRepository(db_path)
+    # Initialisation du repository (partagé entre les réexécutions du script)
+    repository = get_repository(config["database"]["path"])
 
     # Initialisation du data loader
     data_loader = ETFDataLoader(repository)
@@ -52,8 +57,13 @@ def main():
                 "Ticker": etf.ticker,
                 "Nom": etf.name,
                 "Émetteur": etf.issuer,
-                "TER (%)": f"{etf.ter * 100:.2f}%",
-                "Date de création": etf.inception_date.strftime("%Y-%m-%d"),
+                # TER et date de création absents du CSV : chargés à None
+                "TER (%)": f"{etf.ter * 100:.2f}%" if etf.ter is not None else "N/A",
+                "Date de création": (
+                    etf.inception_date.strftime("%Y-%m-%d")
+                    if etf.inception_date is not None
+                    else "N/A"
+                ),
                 "Catégorie": etf.category,
             }
             for etf in etf_metadata
@@ -65,16 +75,20 @@ def main():
         with col1:
             st.write("### Sélection des ETFs")
             all_tickers = [etf.ticker for etf in etf_metadata]
+            # Libellés calculés une fois plutôt qu'une recherche linéaire par option
+            etf_labels = {
+                etf.ticker: f"{etf.ticker} - {etf.name}" for etf in etf_metadata
+            }
             base_etf = st.selectbox(
                 "ETF de référence",
                 all_tickers,
-                format_func=lambda x: f"{x} - {next(etf.name for etf in etf_metadata if etf.ticker == x)}",
+                format_func=etf_labels.get,
             )
 
             comparison_etfs = st.multiselect(
                 "ETFs à comparer",
                 [t for t in all_tickers if t != base_etf],
-                format_func=lambda x: f"{x} - {next(etf.name for etf in etf_metadata if etf.ticker == x)}",
+                format_func=etf_labels.get,
             )
 
         with col2:
@@ -98,11 +112,13 @@ def main():
 
         if st.button("Analyser") and base_etf and comparison_etfs:
             with st.spinner("Récupération des données..."):
-                # Récupération des données de prix
-                base_prices = data_loader.fetch_price_data(base_etf, period=period)
+                # Récupération groupée des données de prix (une requête SQL)
+                all_prices = data_loader.fetch_multiple_etfs_series(
+                    [base_etf, *comparison_etfs], period=period
+                )
+                base_prices = all_prices[base_etf]
                 comparison_prices = {
-                    ticker: data_loader.fetch_price_data(ticker, period=period)
-                    for ticker in comparison_etfs
+                    ticker: all_prices[ticker] for ticker in comparison_etfs
                 }
 
                 # Création du dashboard
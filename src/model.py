@@ -2,10 +2,17 @@
 Modèles de données pour le projet ETF Comparator.
 """
 
+import math
 from dataclasses import dataclass, field
 from datetime import datetime
 from typing import Dict, List, Optional
 
+import numpy as np
+
+# Précision de stockage et de calcul des prix : float32 suffit aux métriques
+# et divise par deux la mémoire et la bande passante par rapport à float64
+PRICE_DTYPE = np.float32
+
 
 @dataclass
 class ETF:
@@ -23,10 +30,54 @@ class ETF:
 class ETFPriceData:
     ticker: str
     date: datetime
-    adj_close: float
+    adj_close: float  # Valeur en précision PRICE_DTYPE une fois passée par une série
     volume: Optional[int] = None
 
 
+@dataclass
+class ETFPriceSeries:
+    """Série de prix stockée par colonnes (tableaux numpy) plutôt que par ligne."""
+
+    ticker: str
+    dates: np.ndarray
+    adj_close: np.ndarray
+    volume: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.adj_close)
+
+    @classmethod
+    def from_price_data(
+        cls, ticker: str, price_data: List[ETFPriceData]
+    ) -> "ETFPriceSeries":
+        """Construit une série à partir d'une liste d'ETFPriceData."""
+        return cls(
+            ticker=ticker,
+            dates=np.array([data.date for data in price_data], dtype=object),
+            adj_close=np.fromiter(
+                (data.adj_close for data in price_data),
+                dtype=PRICE_DTYPE,
+                count=len(price_data),
+            ),
+            volume=np.array([data.volume for data in price_data], dtype=np.float64),
+        )
+
+    def to_price_data(self) -> List[ETFPriceData]:
+        """Convertit la série en liste d'ETFPriceData (compatibilité)."""
+        # Les volumes sont stockés en float64 (NaN pour une valeur absente)
+        return [
+            ETFPriceData(
+                ticker=self.ticker,
+                date=date,
+                adj_close=close,
+                volume=None if math.isnan(volume) else int(volume),
+            )
+            for date, close, volume in zip(
+                self.dates.tolist(), self.adj_close.tolist(), self.volume.tolist()
+            )
+        ]
+
+
 @dataclass
 class PerformanceMetrics:
     ticker: str
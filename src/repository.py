@@ -3,109 +3,460 @@ Module pour la gestion de la persistance des données.
 Interactions avec la base de données SQLite.
 """
 
+import copy
+import queue
 import sqlite3
-from datetime import datetime
-from typing import List, Optional
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+import numpy as np
+import pandas as pd
 
 from src.constants import *
-from src.model import ETF, ETFPriceData
+from src.model import PRICE_DTYPE, ETF, ETFPriceData, ETFPriceSeries
+
+
+# WAL + synchronous=NORMAL : un fsync au checkpoint plutôt qu'à chaque commit,
+# et des lectures qui ne bloquent pas pendant une écriture
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-65536",  # 64 Mo
+    "PRAGMA mmap_size=268435456",  # 256 Mo
+)
+
+
+# Date de création en secondes Unix (INTEGER), comme les dates de prix
+ETFS_DDL = """
+    CREATE TABLE IF NOT EXISTS etfs (
+        ticker TEXT PRIMARY KEY,
+        name TEXT NOT NULL,
+        issuer TEXT,
+        ter REAL,
+        inception_date INTEGER,
+        category TEXT,
+        assets_under_management REAL,
+        description TEXT
+    )
+"""
+
+# Les dates de prix sont stockées en secondes Unix (INTEGER) : index plus compact
+# et conversion Python plus rapide qu'avec des chaînes ISO. Elles sont relues
+# en UTC sans fuseau (datetime naïf)
+PRICE_DATA_DDL = """
+    CREATE TABLE IF NOT EXISTS price_data (
+        ticker TEXT,
+        date INTEGER,
+        adj_close REAL NOT NULL,
+        volume INTEGER,
+        PRIMARY KEY (ticker, date),
+        FOREIGN KEY (ticker) REFERENCES etfs (ticker)
+    )
+"""
+
+# Requêtes constantes : le cache d'instructions de sqlite3 réutilise leur
+# compilation d'un appel à l'autre au lieu de reparser le SQL
+SAVE_ETF_SQL = """
+    INSERT OR REPLACE INTO etfs
+    (ticker, name, issuer, ter, inception_date, category,
+    assets_under_management, description)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+GET_ETF_SQL = """
+    SELECT ticker, name, issuer, ter, inception_date, category,
+    assets_under_management, description
+    FROM etfs WHERE ticker = ?
+"""
+SAVE_PRICE_DATA_SQL = """
+    INSERT OR REPLACE INTO price_data
+    (ticker, date, adj_close, volume)
+    VALUES (?, ?, ?, ?)
+"""
+CLEAR_PRICE_DATA_SQL = "DELETE FROM price_data WHERE ticker = ?"
+# Bornes toujours liées (sentinelles si absentes) : un seul texte SQL, un seul plan
+GET_PRICE_SERIES_SQL = """
+    SELECT date, adj_close, volume FROM price_data
+    WHERE ticker = ? AND date BETWEEN ? AND ?
+    ORDER BY date
+"""
+GET_PRICE_DATA_MULTI_SQL = """
+    SELECT ticker, date, adj_close, volume FROM price_data
+    WHERE ticker IN ({placeholders}) AND date BETWEEN ? AND ?
+    ORDER BY ticker, date
+"""
+
+# Bornes extrêmes d'un INTEGER SQLite (entier signé 64 bits)
+MIN_EPOCH = -(2**63)
+MAX_EPOCH = 2**63 - 1
+
+
+def _to_epoch(date: datetime) -> int:
+    """Convertit une date en secondes Unix ; une date naïve est lue en UTC."""
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=timezone.utc)
+    return int(date.timestamp())
+
+
+def _epoch_bounds(
+    start_date: Optional[datetime], end_date: Optional[datetime]
+) -> Tuple[int, int]:
+    """Bornes de dates en epoch, remplacées par les extrêmes si absentes."""
+    return (
+        _to_epoch(start_date) if start_date else MIN_EPOCH,
+        _to_epoch(end_date) if end_date else MAX_EPOCH,
+    )
+
+
+class PriceCache:
+    """Cache mémoire LRU clé/valeur avec expiration, placé devant SQLite."""
+
+    def __init__(self, default_ttl: int = 86400, maxsize: int = PRICE_CACHE_MAXSIZE):
+        self.default_ttl = default_ttl
+        self.maxsize = maxsize
+        # Ordre d'insertion = ordre d'utilisation : la première entrée est la plus ancienne
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        # Clés par ticker : l'invalidation ne parcourt pas tout le cache
+        self._keys_by_ticker: Dict[str, Set[str]] = {}
+        # Génération par ticker, incrémentée à chaque invalidation : une lecture
+        # commencée avant une écriture ne remet pas en cache des données périmées
+        self._generations: Dict[str, int] = {}
+        # Le cache est partagé par les lectures concurrentes du pool
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def price_key(
+        ticker: str, start_date: Optional[datetime], end_date: Optional[datetime]
+    ) -> str:
+        """Construit la clé de cache d'une requête de prix."""
+        start = start_date.isoformat() if start_date else ""
+        end = end_date.isoformat() if end_date else ""
+        return f"px:{ticker}:{start}:{end}"
+
+    @staticmethod
+    def _ticker_of(key: str) -> str:
+        """Extrait le ticker d'une clé construite par price_key."""
+        return key.split(":", 2)[1]
+
+    def _pop(self, key: str) -> None:
+        """Retire une entrée et sa référence dans l'index par ticker."""
+        self._entries.pop(key, None)
+        ticker = self._ticker_of(key)
+        keys = self._keys_by_ticker.get(ticker)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_ticker[ticker]
+
+    def get(self, key: str) -> Optional[Any]:
+        """Retourne la valeur associée à la clé, ou None si absente ou expirée."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                self._pop(key)
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def generation(self, ticker: str) -> int:
+        """Génération courante d'un ticker, à lire avant la requête SQL."""
+        with self._lock:
+            return self._generations.get(ticker, 0)
+
+    def set(
+        self,
+        key: str,
+        value: Any,
+        ex: Optional[int] = None,
+        generation: Optional[int] = None,
+    ) -> None:
+        """
+        Enregistre une valeur qui expire après `ex` secondes.
+
+        Si `generation` est fourni et que le ticker a été invalidé depuis,
+        la valeur est ignorée.
+        """
+        ttl = self.default_ttl if ex is None else ex
+        with self._lock:
+            ticker = self._ticker_of(key)
+            current = self._generations.get(ticker, 0)
+            if generation is not None and generation != current:
+                return
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            self._keys_by_ticker.setdefault(ticker, set()).add(key)
+            # Éviction des entrées les moins récemment utilisées
+            while len(self._entries) > self.maxsize:
+                self._pop(next(iter(self._entries)))
+
+    def invalidate_ticker(self, ticker: str) -> None:
+        """Supprime toutes les entrées de prix d'un ticker."""
+        with self._lock:
+            self._generations[ticker] = self._generations.get(ticker, 0) + 1
+            for key in self._keys_by_ticker.pop(ticker, ()):
+                self._entries.pop(key, None)
 
 
 class ETFRepository:
-    def __init__(self, db_path: str):
+    def __init__(self, db_path: str, price_cache: Optional[PriceCache] = None):
         self.db_path = db_path
+        self.price_cache = price_cache if price_cache is not None else PriceCache()
+        # Métadonnées d'ETFs quasi statiques : cache mémoire invalidé à l'écriture
+        self._etf_cache: Dict[str, ETF] = {}
+        # Génération par ticker, comme pour PriceCache : une lecture commencée
+        # avant une écriture ne remet pas en cache l'ancienne ligne
+        self._etf_generations: Dict[str, int] = {}
+        self._etf_cache_lock = threading.Lock()
+        # Connexion unique réutilisée par toutes les méthodes (cache de pages chaud).
+        # isolation_level=None : les transactions sont gérées explicitement.
+        self._conn = self._connect()
+        self._lock = threading.RLock()
+        # Connexions de lecture supplémentaires : en WAL, les lectures avancent
+        # en parallèle sans attendre la connexion d'écriture
+        self._read_pool: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._read_slots = threading.BoundedSemaphore(READ_POOL_SIZE)
+        # Protège le retour au pool face à close() : une connexion empruntée
+        # pendant la fermeture est fermée à son retour
+        self._pool_lock = threading.Lock()
+        self._closed = False
         self._init_db()
 
+    def _connect(self) -> sqlite3.Connection:
+        """Ouvre une connexion configurée (pragmas, lignes nommées)."""
+        conn = sqlite3.connect(
+            self.db_path, check_same_thread=False, isolation_level=None
+        )
+        # Lignes accessibles par nom de colonne (sqlite3.Row est implémenté en C)
+        conn.row_factory = sqlite3.Row
+        for pragma in SQLITE_PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    def close(self) -> None:
+        """Ferme la connexion à la base de données."""
+        with self._lock:
+            self._conn.close()
+        with self._pool_lock:
+            self._closed = True
+            while not self._read_pool.empty():
+                self._read_pool.get_nowait().close()
+
+    @contextmanager
+    def _connection(self) -> Iterator[sqlite3.Connection]:
+        """Accès exclusif à la connexion partagée (sans transaction)."""
+        with self._lock:
+            yield self._conn
+
+    @contextmanager
+    def _read_connection(self) -> Iterator[sqlite3.Connection]:
+        """Emprunte une connexion de lecture au pool (au plus READ_POOL_SIZE)."""
+        if self.db_path == ":memory:":
+            # Une base en mémoire n'est visible que depuis sa propre connexion
+            with self._connection() as conn:
+                yield conn
+            return
+
+        with self._read_slots:
+            try:
+                conn = self._read_pool.get_nowait()
+            except queue.Empty:
+                conn = self._connect()
+            try:
+                yield conn
+            finally:
+                with self._pool_lock:
+                    if self._closed:
+                        conn.close()
+                    else:
+                        self._read_pool.put(conn)
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Accès exclusif à la connexion partagée dans une transaction explicite."""
+        with self._lock:
+            # IMMEDIATE : le verrou d'écriture est pris dès le début de la transaction
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
     def _init_db(self):
         """Initialise la base de données avec les tables nécessaires."""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._transaction() as conn:
+            conn.execute(ETFS_DDL)
+            self._migrate_inception_dates_to_epoch(conn)
+
+            conn.execute(PRICE_DATA_DDL)
+            self._migrate_dates_to_epoch(conn)
+
+            # Index couvrant : get_price_series est servi sans lire la table
+            has_covering_index = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = ?",
+                ("idx_price_covering",),
+            ).fetchone()
             conn.execute(
                 """
-                CREATE TABLE IF NOT EXISTS etfs (
-                    ticker TEXT PRIMARY KEY,
-                    name TEXT NOT NULL,
-                    issuer TEXT,
-                    ter REAL,
-                    inception_date TEXT,
-                    category TEXT,
-                    assets_under_management REAL,
-                    description TEXT
-                )
+                CREATE INDEX IF NOT EXISTS idx_price_covering
+                ON price_data (ticker, date, adj_close, volume)
             """
             )
+            if not has_covering_index:
+                conn.execute("ANALYZE")
 
-            conn.execute(
-                """
-                CREATE TABLE IF NOT EXISTS price_data (
-                    ticker TEXT,
-                    date TEXT,
-                    adj_close REAL NOT NULL,
-                    volume INTEGER,
-                    PRIMARY KEY (ticker, date),
-                    FOREIGN KEY (ticker) REFERENCES etfs (ticker)
-                )
+    @staticmethod
+    def _column_type(conn: sqlite3.Connection, table: str, column: str) -> str:
+        """Type déclaré d'une colonne, en majuscules ("" si absente)."""
+        for row in conn.execute(f"PRAGMA table_info({table})"):
+            if row["name"] == column:
+                return row["type"].upper()
+        return ""
+
+    @classmethod
+    def _migrate_inception_dates_to_epoch(cls, conn: sqlite3.Connection) -> None:
+        """Convertit une ancienne table etfs (inception_date ISO en TEXT) en epoch."""
+        if cls._column_type(conn, "etfs", "inception_date") != "TEXT":
+            return
+
+        # Nouvelle table renommée ensuite : la clé étrangère de price_data
+        # continue de désigner "etfs"
+        conn.execute(ETFS_DDL.replace("etfs", "etfs_epoch", 1))
+        conn.execute(
             """
-            )
-            conn.commit()
+            INSERT INTO etfs_epoch
+            SELECT ticker, name, issuer, ter,
+                CAST(strftime('%s', inception_date) AS INTEGER),
+                category, assets_under_management, description
+            FROM etfs
+        """
+        )
+        conn.execute("DROP TABLE etfs")
+        conn.execute("ALTER TABLE etfs_epoch RENAME TO etfs")
+
+    @classmethod
+    def _migrate_dates_to_epoch(cls, conn: sqlite3.Connection) -> None:
+        """Convertit une ancienne table price_data (dates ISO en TEXT) en epoch."""
+        if cls._column_type(conn, "price_data", "date") != "TEXT":
+            return
+
+        # L'affinité TEXT de la colonne impose de recréer la table
+        conn.execute("ALTER TABLE price_data RENAME TO price_data_iso")
+        conn.execute(PRICE_DATA_DDL)
+        conn.execute(
+            """
+            INSERT INTO price_data (ticker, date, adj_close, volume)
+            SELECT ticker, CAST(strftime('%s', date) AS INTEGER), adj_close, volume
+            FROM price_data_iso
+        """
+        )
+        conn.execute("DROP TABLE price_data_iso")
 
     def save_etf(self, etf: ETF) -> None:
         """Sauvegarde ou met à jour un ETF dans la base de données."""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute(
-                """
-                INSERT OR REPLACE INTO etfs 
-                (ticker, name, issuer, ter, inception_date, category, 
-                assets_under_management, description)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """,
+        self.save_etfs_bulk([etf])
+
+    def save_etfs_bulk(self, etfs: Iterable[ETF]) -> None:
+        """Sauvegarde ou met à jour plusieurs ETFs en une seule transaction."""
+        etfs = list(etfs)
+        with self._transaction() as conn:
+            conn.executemany(
+                SAVE_ETF_SQL,
                 (
-                    etf.ticker,
-                    etf.name,
-                    etf.issuer,
-                    etf.ter,
-                    etf.inception_date.isoformat() if etf.inception_date else None,
-                    etf.category,
-                    etf.assets_under_management,
-                    etf.description,
+                    (
+                        etf.ticker,
+                        etf.name,
+                        etf.issuer,
+                        etf.ter,
+                        _to_epoch(etf.inception_date) if etf.inception_date else None,
+                        etf.category,
+                        etf.assets_under_management,
+                        etf.description,
+                    )
+                    for etf in etfs
                 ),
             )
-            conn.commit()
+        with self._etf_cache_lock:
+            for etf in etfs:
+                self._etf_generations[etf.ticker] = (
+                    self._etf_generations.get(etf.ticker, 0) + 1
+                )
+                self._etf_cache.pop(etf.ticker, None)
 
     def get_etf(self, ticker: str) -> Optional[ETF]:
-        """Récupère un ETF par son ticker."""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute("SELECT * FROM etfs WHERE ticker = ?", (ticker,))
+        """Récupère un ETF par son ticker (copie, modifiable sans effet sur le cache)."""
+        with self._etf_cache_lock:
+            cached = self._etf_cache.get(ticker)
+            generation = self._etf_generations.get(ticker, 0)
+        if cached is not None:
+            return copy.copy(cached)
+
+        with self._read_connection() as conn:
+            cursor = conn.execute(GET_ETF_SQL, (ticker,))
             row = cursor.fetchone()
 
             if row is None:
                 return None
 
-            return ETF(
-                ticker=row[0],
-                name=row[1],
-                issuer=row[2],
-                ter=row[3],
-                inception_date=datetime.fromisoformat(row[4]) if row[4] else None,
-                category=row[5],
-                assets_under_management=row[6],
-                description=row[7],
+            inception_date = row["inception_date"]
+            etf = ETF(
+                ticker=row["ticker"],
+                name=row["name"],
+                issuer=row["issuer"],
+                ter=row["ter"],
+                # Date naïve (UTC), comme celles lues depuis le CSV de métadonnées
+                inception_date=(
+                    datetime.fromtimestamp(inception_date, tz=timezone.utc).replace(
+                        tzinfo=None
+                    )
+                    if inception_date is not None
+                    else None
+                ),
+                category=row["category"],
+                assets_under_management=row["assets_under_management"],
+                description=row["description"],
             )
 
+        with self._etf_cache_lock:
+            if generation == self._etf_generations.get(ticker, 0):
+                self._etf_cache[ticker] = etf
+        return copy.copy(etf)
+
     def save_price_data(self, price_data: List[ETFPriceData]) -> None:
         """Sauvegarde les données de prix dans la base de données."""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.executemany(
-                """
-                INSERT OR REPLACE INTO price_data 
-                (ticker, date, adj_close, volume)
-                VALUES (?, ?, ?, ?)
-            """,
-                [
-                    (data.ticker, data.date.isoformat(), data.adj_close, data.volume)
-                    for data in price_data
-                ],
-            )
-            conn.commit()
+        self.save_price_data_raw(
+            (data.ticker, _to_epoch(data.date), data.adj_close, data.volume)
+            for data in price_data
+        )
+
+    def save_price_data_raw(
+        self, rows: Iterable[Tuple[str, int, float, Optional[int]]]
+    ) -> None:
+        """
+        Sauvegarde des lignes de prix déjà normalisées.
+
+        Chaque ligne est un tuple (ticker, date en secondes Unix, adj_close, volume),
+        transmis tel quel à executemany sans passer par ETFPriceData.
+        """
+        tickers = set()
+
+        def track(rows):
+            for row in rows:
+                tickers.add(row[0])
+                yield row
+
+        with self._transaction() as conn:
+            conn.executemany(SAVE_PRICE_DATA_SQL, track(rows))
+        for ticker in tickers:
+            self.price_cache.invalidate_ticker(ticker)
 
     def get_price_data(
         self,
@@ -114,34 +465,118 @@ class ETFRepository:
         end_date: Optional[datetime] = None,
     ) -> List[ETFPriceData]:
         """Récupère les données de prix pour un ETF avec filtrage par date."""
-        with sqlite3.connect(self.db_path) as conn:
-            query = "SELECT * FROM price_data WHERE ticker = ?"
-            params = [ticker]
-
-            if start_date:
-                query += " AND date >= ?"
-                params.append(start_date.isoformat())
-            if end_date:
-                query += " AND date <= ?"
-                params.append(end_date.isoformat())
-
-            query += " ORDER BY date"
-
-            cursor = conn.execute(query, params)
-            rows = cursor.fetchall()
-
-            return [
-                ETFPriceData(
-                    ticker=row[0],
-                    date=datetime.fromisoformat(row[1]),
-                    adj_close=row[2],
-                    volume=row[3],
-                )
-                for row in rows
-            ]
+        return self.get_price_series(ticker, start_date, end_date).to_price_data()
+
+    def get_price_series(
+        self,
+        ticker: str,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+    ) -> ETFPriceSeries:
+        """Récupère les données de prix d'un ETF sous forme de série par colonnes."""
+        cache_key = PriceCache.price_key(ticker, start_date, end_date)
+        cached = self.price_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        generation = self.price_cache.generation(ticker)
+        with self._read_connection() as conn:
+            # pandas lit les lignes directement dans des colonnes typées
+            df = pd.read_sql_query(
+                GET_PRICE_SERIES_SQL,
+                conn,
+                params=(ticker, *_epoch_bounds(start_date, end_date)),
+            )
+
+        price_series = ETFPriceSeries(
+            ticker=ticker,
+            dates=pd.to_datetime(df["date"].to_numpy(), unit="s").to_pydatetime(),
+            adj_close=df["adj_close"].to_numpy(dtype=PRICE_DTYPE),
+            volume=df["volume"].to_numpy(dtype=np.float64),
+        )
+
+        if len(price_series):
+            self.price_cache.set(cache_key, price_series, generation=generation)
+        return price_series
+
+    def get_price_data_multi(
+        self,
+        tickers: List[str],
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+    ) -> Dict[str, List[ETFPriceData]]:
+        """Récupère les prix de plusieurs ETFs en une seule requête `IN (...)`."""
+        return {
+            ticker: price_series.to_price_data()
+            for ticker, price_series in self.get_price_series_multi(
+                tickers, start_date, end_date
+            ).items()
+        }
+
+    def get_price_series_multi(
+        self,
+        tickers: List[str],
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+    ) -> Dict[str, ETFPriceSeries]:
+        """Récupère les séries de plusieurs ETFs en une seule requête `IN (...)`."""
+        result: Dict[str, ETFPriceSeries] = {}
+        missing = []
+        for ticker in dict.fromkeys(tickers):
+            cached = self.price_cache.get(
+                PriceCache.price_key(ticker, start_date, end_date)
+            )
+            if cached is not None:
+                result[ticker] = cached
+            else:
+                missing.append(ticker)
+
+        if not missing:
+            return result
+
+        query = GET_PRICE_DATA_MULTI_SQL.format(
+            placeholders=",".join("?" * len(missing))
+        )
+        params = (*missing, *_epoch_bounds(start_date, end_date))
+
+        generations = {
+            ticker: self.price_cache.generation(ticker) for ticker in missing
+        }
+        with self._read_connection() as conn:
+            df = pd.read_sql_query(query, conn, params=params)
+
+        # Colonnes converties une seule fois pour tous les tickers
+        row_tickers = df["ticker"].to_numpy()
+        dates = pd.to_datetime(df["date"].to_numpy(), unit="s").to_pydatetime()
+        adj_close = df["adj_close"].to_numpy(dtype=PRICE_DTYPE)
+        volume = df["volume"].to_numpy(dtype=np.float64)
+
+        # Lignes triées par ticker : chaque série est une tranche contiguë
+        bounds = np.flatnonzero(row_tickers[1:] != row_tickers[:-1]) + 1
+        for start, end in zip(
+            np.r_[0, bounds].tolist(), np.r_[bounds, len(df)].tolist()
+        ):
+            if start == end:
+                continue
+            ticker = row_tickers[start]
+            price_series = ETFPriceSeries(
+                ticker=ticker,
+                dates=dates[start:end],
+                adj_close=adj_close[start:end],
+                volume=volume[start:end],
+            )
+            result[ticker] = price_series
+            self.price_cache.set(
+                PriceCache.price_key(ticker, start_date, end_date),
+                price_series,
+                generation=generations[ticker],
+            )
+        return result
 
     def clear_price_data(self, ticker: str) -> None:
         """Supprime les données de prix pour un ETF."""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute("DELETE FROM price_data WHERE ticker = ?", (ticker,))
-            conn.commit()
+        with self._transaction() as conn:
+            conn.execute(CLEAR_PRICE_DATA_SQL, (ticker,))
+        # Invalidation après le commit : une lecture concurrente ne peut plus
+        # remettre en cache les lignes supprimées
+        self.price_cache.invalidate_ticker(ticker)
@@ -3,14 +3,151 @@ Module pour la visualisation des données et des résultats d'analyse.
 Génération des graphiques et des tableaux avec Streamlit.
 """
 
+from dataclasses import asdict, astuple
 from datetime import datetime
-from typing import Dict, List
+from typing import Dict, List, Optional, Sequence, Tuple
 
+import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
 import streamlit as st
 
-from src.model import ETF, ComparisonResult, PerformanceMetrics
+from src.model import ETF, ComparisonResult, ETFPriceSeries, PerformanceMetrics
+
+
+# Colonnes du tableau des métriques : champ -> (libellé, format d'affichage)
+METRICS_TABLE_COLUMNS = {
+    "total_return": ("Rendement Total", "{:.2%}"),
+    "annualized_return": ("Rendement Annualisé", "{:.2%}"),
+    "volatility": ("Volatilité", "{:.2%}"),
+    "sharpe_ratio": ("Ratio de Sharpe", "{:.2f}"),
+    "sortino_ratio": ("Ratio de Sortino", "{:.2f}"),
+    "max_drawdown": ("Drawdown Maximum", "{:.2%}"),
+    "beta": ("Beta", "{:.2f}"),
+    "alpha": ("Alpha", "{:.2%}"),
+    "r_squared": ("R²", "{:.2%}"),
+    "tracking_error": ("Tracking Error", "{:.2%}"),
+    "information_ratio": ("Ratio d'Information", "{:.2f}"),
+}
+
+
+def normalize_prices(prices: Sequence[float]) -> np.ndarray:
+    """Normalise une série de prix en base 100, en une seule opération vectorisée."""
+    prices_array = np.asarray(prices, dtype=np.float64)
+    return prices_array * (100.0 / prices_array[0])
+
+
+def _prices_cache_key(
+    prices_by_ticker: Dict[str, ETFPriceSeries],
+) -> Tuple[Tuple[str, int, Optional[datetime], Optional[datetime], bytes], ...]:
+    """Clé hachable décrivant le contenu d'un ensemble de séries de prix."""
+    # Première et dernière dates : deux sélections aux mêmes prix mais sur
+    # des périodes différentes n'ont pas la même clé
+    return tuple(
+        (
+            ticker,
+            len(prices),
+            prices.dates[0] if len(prices) else None,
+            prices.dates[-1] if len(prices) else None,
+            prices.adj_close.tobytes(),
+        )
+        for ticker, prices in prices_by_ticker.items()
+    )
+
+
+@st.cache_data(ttl=600, show_spinner=False)
+def _compute_all_metrics(
+    cache_key: Tuple,
+    _prices_by_ticker: Dict[str, ETFPriceSeries],
+    risk_free_rate: float,
+) -> Dict[str, PerformanceMetrics]:
+    """Calcule les métriques ; le cache est indexé sur `cache_key`."""
+    from src.helpers_business import compute_all_metrics
+
+    return compute_all_metrics(_prices_by_ticker, risk_free_rate)
+
+
+@st.cache_data(ttl=600, show_spinner=False)
+def _build_perf_figure(
+    cache_key: Tuple, _all_prices: Dict[str, ETFPriceSeries]
+) -> go.Figure:
+    """Construit le graphique de performance relative (base 100)."""
+    fig = go.Figure()
+
+    for ticker, prices in _all_prices.items():
+        # Normalisation des prix (base 100)
+        normalized_prices = normalize_prices(prices.adj_close)
+
+        fig.add_trace(
+            go.Scatter(x=prices.dates, y=normalized_prices, name=ticker, mode="lines")
+        )
+
+    fig.update_layout(
+        title="Performance relative (base 100)",
+        xaxis_title="Date",
+        yaxis_title="Performance (%)",
+        hovermode="x unified",
+    )
+    return fig
+
+
+def _metrics_cache_key(
+    metrics: Dict[str, PerformanceMetrics],
+) -> Tuple[Tuple[str, tuple], ...]:
+    """Clé hachable des métriques, dans l'ordre d'affichage des ETFs."""
+    return tuple((ticker, astuple(metric)) for ticker, metric in metrics.items())
+
+
+@st.cache_resource(ttl=600, show_spinner=False)
+def _build_metrics_df(
+    cache_key: Tuple, _metrics: Dict[str, PerformanceMetrics]
+) -> pd.DataFrame:
+    """Construit le tableau des métriques (valeurs brutes, libellés français)."""
+    # Valeurs brutes dans un DataFrame ; le formatage est délégué au Styler pandas
+    df = pd.DataFrame(
+        [asdict(metric) for metric in _metrics.values()], index=list(_metrics)
+    )
+    df = df[list(METRICS_TABLE_COLUMNS)].rename(
+        columns={field: label for field, (label, _) in METRICS_TABLE_COLUMNS.items()}
+    )
+    df.index.name = "ETF"
+    return df
+
+
+@st.cache_resource(ttl=600, show_spinner=False)
+def _build_radar_fig(
+    cache_key: Tuple, _metrics: Dict[str, PerformanceMetrics]
+) -> go.Figure:
+    """Construit le graphique radar des métriques clés."""
+    categories = ["Rendement", "Sharpe", "Volatilité", "Max Drawdown"]
+
+    fig = go.Figure()
+
+    for ticker, metric in _metrics.items():
+        fig.add_trace(
+            go.Scatterpolar(
+                r=[
+                    metric.annualized_return * 100,  # En pourcentage
+                    metric.sharpe_ratio,
+                    metric.volatility * 100,  # En pourcentage
+                    metric.max_drawdown * 100,  # En pourcentage
+                ],
+                theta=categories,
+                name=ticker,
+                fill="toself",
+            )
+        )
+
+    fig.update_layout(
+        polar=dict(
+            radialaxis=dict(
+                visible=True, range=[-50, 50]  # Ajuster selon les valeurs réelles
+            )
+        ),
+        title="Comparaison des métriques clés",
+        showlegend=True,
+    )
+    return fig
 
 
 class ETFDashboard:
@@ -34,7 +171,7 @@ class ETFDashboard:
         fig = go.Figure()
 
         for ticker, prices in price_data.items():
-            normalized_prices = [p / prices[0] for p in prices]
+            normalized_prices = normalize_prices(prices)
             fig.add_trace(go.Scatter(y=normalized_prices, name=ticker, mode="lines"))
 
         fig.update_layout(
@@ -48,77 +185,24 @@ class ETFDashboard:
 
     def display_metrics_table(self, metrics: Dict[str, PerformanceMetrics]):
         """Affiche un tableau des métriques de performance."""
-        data = []
-        for ticker, metric in metrics.items():
-            data.append(
-                {
-                    "ETF": ticker,
-                    "Rendement Total": f"{metric.total_return:.2%}",
-                    "Rendement Annualisé": f"{metric.annualized_return:.2%}",
-                    "Volatilité": f"{metric.volatility:.2%}",
-                    "Ratio de Sharpe": f"{metric.sharpe_ratio:.2f}",
-                    "Ratio de Sortino": (
-                        f"{metric.sortino_ratio:.2f}" if metric.sortino_ratio else "N/A"
-                    ),
-                    "Drawdown Maximum": f"{metric.max_drawdown:.2%}",
-                    "Beta": f"{metric.beta:.2f}" if metric.beta else "N/A",
-                    "Alpha": f"{metric.alpha:.2%}" if metric.alpha else "N/A",
-                    "R²": f"{metric.r_squared:.2%}" if metric.r_squared else "N/A",
-                    "Tracking Error": (
-                        f"{metric.tracking_error:.2%}"
-                        if metric.tracking_error
-                        else "N/A"
-                    ),
-                    "Ratio d'Information": (
-                        f"{metric.information_ratio:.2f}"
-                        if metric.information_ratio
-                        else "N/A"
-                    ),
-                }
-            )
-
-        df = pd.DataFrame(data)
-        st.dataframe(df, use_container_width=True)
+        df = _build_metrics_df(_metrics_cache_key(metrics), metrics)
+        styler = df.style.format(
+            {label: fmt for label, fmt in METRICS_TABLE_COLUMNS.values()},
+            na_rep="N/A",
+        )
+        st.dataframe(styler, use_container_width=True)
 
     def plot_metrics_radar(self, metrics: Dict[str, PerformanceMetrics]):
         """Crée un graphique radar des métriques clés."""
-        categories = ["Rendement", "Sharpe", "Volatilité", "Max Drawdown"]
-
-        fig = go.Figure()
-
-        for ticker, metric in metrics.items():
-            fig.add_trace(
-                go.Scatterpolar(
-                    r=[
-                        metric.annualized_return * 100,  # En pourcentage
-                        metric.sharpe_ratio,
-                        metric.volatility * 100,  # En pourcentage
-                        metric.max_drawdown * 100,  # En pourcentage
-                    ],
-                    theta=categories,
-                    name=ticker,
-                    fill="toself",
-                )
-            )
-
-        fig.update_layout(
-            polar=dict(
-                radialaxis=dict(
-                    visible=True, range=[-50, 50]  # Ajuster selon les valeurs réelles
-                )
-            ),
-            title="Comparaison des métriques clés",
-            showlegend=True,
-        )
-
+        fig = _build_radar_fig(_metrics_cache_key(metrics), metrics)
         st.plotly_chart(fig, use_container_width=True)
 
     def display_comparison(
         self,
         base_etf: ETF,
         comparison_etfs: List[ETF],
-        base_prices: List[float],
-        comparison_prices: Dict[str, List[float]],
+        base_prices: ETFPriceSeries,
+        comparison_prices: Dict[str, ETFPriceSeries],
         risk_free_rate: float = 0.01,
     ):
         """Affiche la comparaison complète des ETFs."""
@@ -132,43 +216,17 @@ class ETFDashboard:
             all_prices = {base_etf.ticker: base_prices}
             all_prices.update(comparison_prices)
 
-            # Extraction des dates à partir des données
-            dates = [price.date for price in base_prices]
-
-            # Préparation des données pour le graphique
-            fig = go.Figure()
+            # Clé calculée une fois, partagée par la figure et les métriques
+            prices_key = _prices_cache_key(all_prices)
 
-            for ticker, prices in all_prices.items():
-                # Normalisation des prix (base 100)
-                normalized_prices = [
-                    100 * price.adj_close / prices[0].adj_close for price in prices
-                ]
-
-                fig.add_trace(
-                    go.Scatter(x=dates, y=normalized_prices, name=ticker, mode="lines")
-                )
-
-            fig.update_layout(
-                title="Performance relative (base 100)",
-                xaxis_title="Date",
-                yaxis_title="Performance (%)",
-                hovermode="x unified",
-            )
+            # Figure mémorisée entre les réexécutions Streamlit
+            fig = _build_perf_figure(prices_key, all_prices)
 
             st.plotly_chart(fig, use_container_width=True)
 
         with col2:
-            # Calcul et affichage des métriques
-            from src.helpers_business import calculate_performance_metrics
-
-            metrics = {
-                base_etf.ticker: calculate_performance_metrics(
-                    base_prices, risk_free_rate
-                )
-            }
-
-            for ticker, prices in comparison_prices.items():
-                metrics[ticker] = calculate_performance_metrics(prices, risk_free_rate)
+            # Calcul et affichage des métriques (mémorisés entre les réexécutions)
+            metrics = _compute_all_metrics(prices_key, all_prices, risk_free_rate)
 
             # Tableau des métriques
             self.display_metrics_table(metrics)